@@ -1,10 +1,19 @@
-from . import tts
-from .tts import TTS
-from .tts_v2 import TTSV2
-from .stt import STT
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from livekit.agents import Plugin
+
+from .log import logger
 from .version import __version__
-from .sentence_tokenizer import ChineseSentenceTokenizer
-from .word_tokenizer import ChineseWordTokenizer
+
+if TYPE_CHECKING:
+    from .sentence_tokenizer import ChineseSentenceTokenizer
+    from .stt import STT
+    from .tts import TTS
+    from .tts_v2 import TTSV2
+    from .word_tokenizer import ChineseWordTokenizer
 
 __all__ = [
     "TTS",
@@ -15,8 +24,30 @@ __all__ = [
     "ChineseWordTokenizer",
 ]
 
-from livekit.agents import Plugin
-from .log import logger
+# 按需导入子模块(PEP 562),只使用其中一部分功能时无需加载全部依赖
+_LAZY = {
+    "tts": (".tts", None),
+    "TTS": (".tts", "TTS"),
+    "TTSV2": (".tts_v2", "TTSV2"),
+    "STT": (".stt", "STT"),
+    "ChineseSentenceTokenizer": (".sentence_tokenizer", "ChineseSentenceTokenizer"),
+    "ChineseWordTokenizer": (".word_tokenizer", "ChineseWordTokenizer"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _LAZY[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 class DashScopePlugin(Plugin):
     def __init__(self) -> None:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+from contextlib import suppress
+from typing import Any
+
+from dashscope.audio.tts_v2 import SpeechSynthesizer
+
+try:
+    from dashscope.audio.tts_v2 import SpeechSynthesizerObjectPool
+except ImportError:  # 旧版本SDK没有对象池,退化为每次新建合成器
+    SpeechSynthesizerObjectPool = None
+
+from ._executor import run_blocking
+from .log import logger
+
+# 预先建立WebSocket连接的合成器数量,进程内所有启用连接池的TTSV2实例共享
+POOL_SIZE = 4
+
+_pool: Any = None
+_pool_users = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Any:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 创建对象池时会同步建立连接,只在线程池中调用
+            _pool = SpeechSynthesizerObjectPool(max_size=POOL_SIZE)
+        return _pool
+
+
+def _borrow(**kwargs: Any) -> SpeechSynthesizer:
+    return _get_pool().borrow_synthesizer(**kwargs)
+
+
+def _shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def available() -> bool:
+    """当前SDK是否支持合成器对象池"""
+    return SpeechSynthesizerObjectPool is not None
+
+
+def retain_pool() -> None:
+    """登记一个对象池使用者,须与 release_pool 成对调用"""
+    global _pool_users
+    with _pool_lock:
+        _pool_users += 1
+
+
+async def release_pool() -> None:
+    """注销一个对象池使用者,最后一个使用者注销时关闭对象池
+
+    对象池的重连线程不是守护线程,不关闭对象池会导致解释器无法退出;
+    atexit 在等待非守护线程之后才执行,因此必须在插件关闭时显式调用。
+    """
+    global _pool_users
+    with _pool_lock:
+        _pool_users -= 1
+        last = _pool_users == 0
+    if last:
+        # shutdown 会等待重连线程结束(最长约一个重连周期),在线程池中执行
+        await run_blocking(_shutdown)
+
+
+async def acquire(*, pooled: bool, **kwargs: Any) -> SpeechSynthesizer:
+    """获取一个合成器,其余参数与 SpeechSynthesizer 的构造参数相同
+
+    pooled 为真时复用对象池中已建立连接的合成器,省去每次合成的TLS/WebSocket握手。
+    """
+    if not pooled:
+        return SpeechSynthesizer(**kwargs)
+    return await run_blocking(_borrow, **kwargs)
+
+
+def release(synthesizer: SpeechSynthesizer, *, pooled: bool) -> None:
+    """将合成器归还到对象池
+
+    只能归还已成功完成合成任务的合成器。任务失败或被取消时,工作线程中的SDK调用可能仍在运行,
+    归还后会被其他流借出并替换回调,导致音频串流到其他会话,此时应调用 discard 丢弃。
+    """
+    if not pooled:
+        return
+    try:
+        _get_pool().return_synthesizer(synthesizer)
+    except Exception as e:
+        logger.warning(f"归还合成器失败: {e}")
+
+
+def _discard(synthesizer: SpeechSynthesizer, pooled: bool) -> None:
+    # 任务未开始或已结束时 streaming_cancel 会抛出异常,关闭连接同理,均可忽略
+    with suppress(Exception):
+        synthesizer.streaming_cancel()
+    with suppress(Exception):
+        synthesizer.close()
+    if not pooled:
+        return
+    with _pool_lock:
+        pool = _pool
+    if pool is None:
+        return
+    # 借出的合成器不会被对象池自动补充;放回一个未连接的合成器占位,由重连线程为其建立新连接,
+    # 否则每丢弃一次对象池就少一个可用连接
+    try:
+        pool.return_synthesizer(
+            SpeechSynthesizer(model=pool.DEFAULT_MODEL, voice=pool.DEFAULT_VOICE)
+        )
+    except Exception as e:
+        logger.warning(f"补充对象池失败: {e}")
+
+
+async def discard(synthesizer: SpeechSynthesizer, *, pooled: bool) -> None:
+    """丢弃合成失败或被取消的合成器:取消仍在进行的任务并关闭连接"""
+    await run_blocking(_discard, synthesizer, pooled)
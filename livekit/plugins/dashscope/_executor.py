@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+# DashScope SDK 的调用(建立连接、等待合成/识别完成)都是同步阻塞的,
+# 统一放到插件内共享的有界线程池中执行,避免阻塞事件循环,也避免线程数无限增长
+MAX_WORKERS = 32
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="dashscope")
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在共享线程池中执行阻塞调用"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
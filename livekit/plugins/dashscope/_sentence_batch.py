@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from dashscope.audio.tts_v2 import SpeechSynthesizer
+from livekit.agents import tokenize, utils
+
+from ._executor import run_blocking
+from .log import logger
+
+
+async def submit_sentences(
+    sent_stream: tokenize.SentenceStream,
+    synthesizer: SpeechSynthesizer,
+    batch_chars: int,
+    max_batch_sentences: int,
+) -> None:
+    """将分句结果提交给合成器
+
+    合成器忙于上一次 streaming_call 时,期间已就绪的同一段落(segment)内的句子会合并为一次提交,
+    上限为 batch_chars 个字符或 max_batch_sentences 个句子。不会为凑批次而等待后续文本,
+    因此每段的首句以及 flush 产生的句子都会立即提交。
+    """
+    ready: asyncio.Queue[tokenize.TokenData | None] = asyncio.Queue()
+
+    async def pump_task() -> None:
+        try:
+            async for ev in sent_stream:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[[tts.sentence_stream_task]] detected: %s", ev.token)
+                ready.put_nowait(ev)
+        finally:
+            ready.put_nowait(None)
+
+    pump = asyncio.create_task(pump_task())
+    try:
+        ev = await ready.get()
+        while ev is not None:
+            batch = [ev.token]
+            chars = len(ev.token)
+            carried = False
+            while (
+                not ready.empty()
+                and chars < batch_chars
+                and len(batch) < max_batch_sentences
+            ):
+                nxt = ready.get_nowait()
+                if nxt is None or nxt.segment_id != ev.segment_id:
+                    # 输入结束或进入新的段落,留到下一次提交
+                    carried = True
+                    break
+                batch.append(nxt.token)
+                chars += len(nxt.token)
+            await run_blocking(synthesizer.streaming_call, " ".join(batch))
+            ev = nxt if carried else await ready.get()
+        await pump
+    finally:
+        await utils.aio.gracefully_cancel(pump)
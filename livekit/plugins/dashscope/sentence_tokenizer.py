@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import dataclasses
 import functools
+import re
 from dataclasses import dataclass
 from typing import Callable
 
 from livekit.agents import tokenize
 from livekit.agents.tokenize import SentenceStream, BufferedSentenceStream
 
-@dataclass
+TOKENIZE_CACHE_SIZE = 4096  # 分句结果缓存条数
+
+@dataclass(frozen=True)
 class _TokenizerOptions:
     """中文分句器的配置选项"""
     min_sentence_len: int  # 最小句子长度
@@ -40,10 +42,22 @@ class ChineseSentenceTokenizer(tokenize.SentenceTokenizer):
             sentence_ends=['。', '！', '？', '…', '；', '.', '!', '?', '...', ';'],
             quote_pairs={'"': '"', '"': '"', '「': '」', '『': '』', '“': '”', '《': '》', '〈': '〉', '【': '】', '（': '）'}
         )
+        # 预先构建查找表,避免在逐字符循环中反复扫描列表
+        self._ends = frozenset(self._config.sentence_ends)
+        self._open = frozenset(self._config.quote_pairs)
+        self._close = frozenset(self._config.quote_pairs.values())
+        self._qmap = self._config.quote_pairs
+        self._quote_chars = self._open | self._close
+        # 每个匹配为"若干非句末字符 + 一个句末标点",由 re 的 C 实现完成扫描
+        # ('...' 由单个 '.' 覆盖,多字符标记无需单独处理)
+        ends_class = "".join(re.escape(end) for end in self._ends if len(end) == 1)
+        self._split_re = re.compile(f"[^{ends_class}]*[{ends_class}]")
+        # 系统提示、问候语等相同文本会被反复合成,按实例缓存分句结果(配置在实例内不变)
+        self._tokenize_cached = functools.lru_cache(maxsize=TOKENIZE_CACHE_SIZE)(self._tokenize)
 
     def _sanitize_options(self) -> _TokenizerOptions:
-        """返回配置的副本"""
-        return dataclasses.replace(self._config)
+        """返回配置(配置为不可变对象,无需复制)"""
+        return self._config
 
     def _split_sentences(self, text: str) -> list[str]:
         """核心分句逻辑"""
@@ -51,48 +65,61 @@ class ChineseSentenceTokenizer(tokenize.SentenceTokenizer):
             return []
             
         sentences = []
-        current_sentence = ''
         quote_stack = []  # 用于追踪引号的栈
-        
-        for char in text:
-            current_sentence += char
-            
-            # 处理引号
-            if char in self._config.quote_pairs.keys():
-                quote_stack.append(char)
-            elif char in self._config.quote_pairs.values():
-                if quote_stack and self._config.quote_pairs[quote_stack[-1]] == char:
-                    quote_stack.pop()
-                    
-            # 当遇到句末标点且不在引号内时,进行分句
-            if char in self._config.sentence_ends and not quote_stack:
-                if current_sentence.strip():
-                    sentences.append(current_sentence.strip())
-                current_sentence = ''
-                
+        open_quotes, close_quotes, qmap = self._open, self._close, self._qmap
+        quote_chars = self._quote_chars
+        start = 0  # 当前句子的起始位置
+
+        for match in self._split_re.finditer(text):
+            segment = match.group()
+
+            # 仅当片段包含引号或仍处于引号内时,才逐字符更新引号栈
+            if quote_stack or not quote_chars.isdisjoint(segment):
+                for char in segment:
+                    if char in open_quotes:
+                        quote_stack.append(char)
+                    elif char in close_quotes:
+                        if quote_stack and qmap[quote_stack[-1]] == char:
+                            quote_stack.pop()
+                if quote_stack:
+                    continue
+
+            # 片段以句末标点结束且不在引号内,进行分句
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+
         # 处理最后一个句子
-        if current_sentence.strip():
-            sentences.append(current_sentence.strip())
-            
+        sentence = text[start:].strip()
+        if sentence:
+            sentences.append(sentence)
+
         return sentences
 
     def tokenize(self, text: str) -> list[str]:
         """将文本分割成句子列表,并合并过短的句子"""
+        return list(self._tokenize_cached(text))
+
+    def _tokenize(self, text: str) -> tuple[str, ...]:
         raw_sentences = self._split_sentences(text)
         
         # 合并过短的句子
         sentences = []
-        buff = ""
+        buff = []
+        buff_len = 0  # 以空格连接后的长度 + 1
         for sentence in raw_sentences:
-            buff += sentence + " "
-            if len(buff) - 1 >= self._config.min_sentence_len:
-                sentences.append(buff.rstrip())
-                buff = ""
+            buff.append(sentence)
+            buff_len += len(sentence) + 1
+            if buff_len - 1 >= self._config.min_sentence_len:
+                sentences.append(" ".join(buff))
+                buff.clear()
+                buff_len = 0
 
         if buff:
-            sentences.append(buff.rstrip())
+            sentences.append(" ".join(buff))
 
-        return sentences
+        return tuple(sentences)
 
     def _is_sentence_complete(self, text: str) -> bool:
         """判断文本是否构成完整的句子"""
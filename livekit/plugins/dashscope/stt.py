@@ -1,20 +1,23 @@
 from __future__ import annotations
 
+import contextlib
 import os
-import tempfile
-import wave
+import threading
 from dataclasses import dataclass
-from http import HTTPStatus
 
 import dashscope
 from dashscope.audio.asr import Recognition, RecognitionCallback, RecognitionResult
+from dashscope.common.error import InvalidParameter
 from livekit.agents import stt, utils
 from livekit.agents.utils import AudioBuffer, merge_frames
 
+from ._executor import run_blocking
 from .log import logger
 # https://help.aliyun.com/zh/dashscope/developer-reference/real-time-speech-recognition-api-details
 
 DASHSCOPE_SAMPLE_RATE = 16000
+# 识别失败时,SDK先停止识别再回调 on_error,等待该回调的最长时间(秒)
+ERROR_CALLBACK_TIMEOUT = 1.0
 
 @dataclass
 class STTOptions:
@@ -26,6 +29,7 @@ class STTOptions:
     enable_timestamp: bool
     enable_semantic_sentence: bool
     language: str
+    frames_per_burst: int  # 每次发送的采样数
 
 class STT(stt.STT):
     def __init__(
@@ -38,6 +42,7 @@ class STT(stt.STT):
         enable_timestamp: bool = False,
         enable_semantic_sentence: bool = True,
         language: str = "zh",
+        frames_per_burst: int = DASHSCOPE_SAMPLE_RATE // 10,
         api_key: str | None = None,
     ) -> None:
         """
@@ -51,6 +56,7 @@ class STT(stt.STT):
             enable_timestamp: 是否启用时间戳
             enable_semantic_sentence: 是否启用语义分句
             language: 语言,默认为zh
+            frames_per_burst: 流式识别每次发送的采样数,默认为100ms
             api_key: DashScope API密钥
         """
         super().__init__(
@@ -60,6 +66,9 @@ class STT(stt.STT):
             )
         )
 
+        if frames_per_burst <= 0:
+            raise ValueError("frames_per_burst must be positive")
+
         # 验证API key
         api_key = api_key or os.environ.get("DASHSCOPE_API_KEY")
         if api_key is None:
@@ -75,51 +84,86 @@ class STT(stt.STT):
             enable_punctuation=enable_punctuation,
             enable_timestamp=enable_timestamp,
             enable_semantic_sentence=enable_semantic_sentence,
-            language=language
+            language=language,
+            frames_per_burst=frames_per_burst,
         )
 
     async def recognize(self, buffer: AudioBuffer, **kwargs) -> stt.SpeechEvent:
         """实现非流式识别"""
-        logger.info(f"\033[32mDashScope STT recognize调用\033[0m")
+        logger.debug("DashScope STT recognize调用")
+
+        class RecognizeCallback(RecognitionCallback):
+            def __init__(self):
+                self.sentences: list[str] = []
+                self.error: RecognitionResult | None = None
+                self.failed = threading.Event()
+
+            def on_error(self, result: RecognitionResult) -> None:
+                self.error = result
+                self.failed.set()
 
-        # 创建识别器实例并调用API
+            def on_event(self, result: RecognitionResult) -> None:
+                sentence = result.get_sentence()
+                if sentence and RecognitionResult.is_sentence_end(sentence):
+                    self.sentences.append(sentence.get("text", ""))
+
+        buffer = merge_frames(buffer)
+        callback = RecognizeCallback()
+
+        # Recognition.call 只接受文件路径,这里改为直接推送内存中的PCM数据,避免写临时文件
         recognition = Recognition(
             model=self._opts.model,
-            format=self._opts.format, 
+            format="pcm",
             sample_rate=buffer.sample_rate,
-            callback=None
-        )        
-        buffer = merge_frames(buffer)
-        # 直接写入临时文件
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=True) as temp_file:
-            with wave.open(temp_file, "wb") as wav:
-                wav.setnchannels(buffer.num_channels)
-                wav.setsampwidth(2)  # 16-bit
-                wav.setframerate(buffer.sample_rate)
-                wav.writeframes(buffer.data)
-            temp_file_path = temp_file.name
-            result = recognition.call(temp_file_path)
-            if result.status_code == HTTPStatus.OK:
-                text = "".join(sentence.get("text", "") for sentence in result.get_sentence() or [])
-                logger.debug(f"识别结果: {text}")
-                return stt.SpeechEvent(
-                    type=stt.SpeechEventType.FINAL_TRANSCRIPT,
-                    alternatives=[
-                        stt.SpeechData(
-                            text=text,
-                            confidence=1.0,
-                            language=self._opts.language,
-                        )
-                    ]
+            callback=callback
+        )
+        data = memoryview(buffer.data).cast("B")
+        # 按100ms分块发送
+        chunk_size = buffer.sample_rate // 10 * buffer.num_channels * 2  # 16-bit
+
+        def _recognize() -> None:
+            recognition.start()
+            try:
+                for offset in range(0, len(data), chunk_size):
+                    if callback.failed.is_set():
+                        break
+                    recognition.send_audio_frame(bytes(data[offset:offset + chunk_size]))
+                # 服务端报错后识别已停止,不能再调用 stop
+                if not callback.failed.is_set():
+                    recognition.stop()
+            except InvalidParameter:
+                # 识别已被服务端终止,错误信息由 on_error 记录,稍后统一抛出
+                if not callback.failed.wait(timeout=ERROR_CALLBACK_TIMEOUT):
+                    raise
+            except Exception:
+                if not callback.failed.is_set():
+                    with contextlib.suppress(Exception):
+                        recognition.stop()
+                raise
+
+        # start/stop 会阻塞直到连接建立、识别完成,放到线程池中执行
+        await run_blocking(_recognize)
+
+        if callback.error is not None:
+            logger.error(f"识别请求失败: {callback.error.message}")
+            raise Exception(f"识别请求失败: {callback.error.message}")
+
+        text = "".join(callback.sentences)
+        logger.debug("识别结果: %s", text)
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[
+                stt.SpeechData(
+                    text=text,
+                    confidence=1.0,
+                    language=self._opts.language,
                 )
-            else:
-                logger.error(f"识别请求失败: {result.message}")
-                raise Exception(f"识别请求失败: {result.message}")
-        
-        
+            ]
+        )
+
     def stream(self) -> "SpeechStream":
         """实现流式识别"""
-        logger.info(f"\033[32mDashScope STT stream调用\033[0m")
+        logger.debug("DashScope STT stream调用")
         config = self._sanitize_options()
         return SpeechStream(config)
 
@@ -184,21 +228,40 @@ class SpeechStream(stt.SpeechStream):
             callback=StreamCallback(self)
         )
         
-        # 开始识别
-        self._recognition.start()
-        
+        # 开始识别(建立连接是阻塞调用)
+        await run_blocking(self._recognition.start)
+
+        # 将输入帧拷贝进预分配的缓冲区,凑满固定大小的音频块再发送(16-bit 单声道)
+        burst_bytes = self._opts.frames_per_burst * 2
+        scratch = memoryview(bytearray(burst_bytes))
+        pos = 0
+
         try:
             # 处理输入音频
             async for data in self._input_ch:
                 if isinstance(data, self._FlushSentinel):
+                    if pos:
+                        self._recognition.send_audio_frame(bytes(scratch[:pos]))
+                        pos = 0
                     continue
-                    
-                # 发送音频数据
-                self._recognition.send_audio_frame(data.data.tobytes())
-                
+
+                src = memoryview(data.data).cast("B")
+                while src:
+                    take = min(burst_bytes - pos, len(src))
+                    scratch[pos:pos + take] = src[:take]
+                    pos += take
+                    src = src[take:]
+                    if pos == burst_bytes:
+                        # 发送音频数据(SDK异步发送,需交给它一份独立的拷贝)
+                        self._recognition.send_audio_frame(bytes(scratch))
+                        pos = 0
+
         finally:
             # 停止识别
             if self._recognition:
-                self._recognition.stop()
-                self._recognition = None
+                if pos:
+                    self._recognition.send_audio_frame(bytes(scratch[:pos]))
+                # stop 会等待识别结束,放到线程池中执行
+                recognition, self._recognition = self._recognition, None
+                await run_blocking(recognition.stop)
 
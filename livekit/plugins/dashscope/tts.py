@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 import base64
 from dataclasses import dataclass
-from typing import AsyncContextManager, Literal
+from typing import AsyncContextManager, AsyncIterator, Literal
 
 import dashscope
 from dashscope.api_entities.dashscope_response import SpeechSynthesisResponse
@@ -12,11 +14,16 @@ from dashscope.audio.tts import SpeechSynthesizer, SpeechSynthesisResult, Result
 from livekit.agents import tts, utils
 from livekit import rtc
 
+from ._executor import run_blocking
 from .log import logger
 
 # DashScope TTS 默认音频参数
 DASHSCOPE_TTS_SAMPLE_RATE = 24000
 DASHSCOPE_TTS_CHANNELS = 1
+# 批量合成的默认并发数
+BATCH_CONCURRENCY = 4
+# 批量合成时缓存的音频帧上限,消费方处理不及时时暂停读取合成结果
+BATCH_QUEUE_SIZE = 64
 
 AudioFormat = Literal["wav", "mp3", "pcm"]
 
@@ -83,6 +90,58 @@ class TTS(tts.TTS):
             opts=self._opts
         )
 
+    async def synthesize_batch(
+        self,
+        texts: list[str],
+        *,
+        max_concurrency: int = BATCH_CONCURRENCY,
+    ) -> AsyncIterator[tuple[int, tts.SynthesizedAudio]]:
+        """批量合成多段文本,适用于离线旁白、数据预生成等吞吐优先的场景
+
+        DashScope 语音合成没有批量任务接口,这里以受限并发的方式同时发起多个合成请求,
+        以 (下标, 音频帧) 的形式按到达顺序产出,下标为所属文本在 texts 中的位置;
+        同一文本的音频帧保持先后顺序,不同文本的音频帧可能交错。
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        pending = enumerate(texts)
+        queue: asyncio.Queue[tuple[int, tts.SynthesizedAudio] | Exception | None] = (
+            asyncio.Queue(maxsize=BATCH_QUEUE_SIZE)
+        )
+
+        async def worker() -> None:
+            # 各工作协程共享同一个迭代器,每次取下一段文本,同时进行的请求不超过 max_concurrency
+            try:
+                for index, text in pending:
+                    stream = self.synthesize(text)
+                    try:
+                        async for audio in stream:
+                            # 队列已满时在此等待,消费方跟不上时不再继续缓存音频
+                            await queue.put((index, audio))
+                    finally:
+                        await stream.aclose()
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                item = await queue.get()
+                if item is None:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    # 传播合成过程中的异常
+                    raise item
+                else:
+                    yield item
+        finally:
+            # 任一请求失败或调用方提前结束迭代时,停止其余仍在运行的合成请求
+            await utils.aio.gracefully_cancel(*workers)
+
 class ChunkedStream(tts.ChunkedStream):
     def __init__(
         self,
@@ -93,34 +152,50 @@ class ChunkedStream(tts.ChunkedStream):
         super().__init__()
         self._text = text
         self._opts = opts
+        # 音频缓冲随流对象创建一次,由回调复用
+        self._audio_bstream = utils.audio.AudioByteStream(
+            sample_rate=DASHSCOPE_TTS_SAMPLE_RATE,
+            num_channels=DASHSCOPE_TTS_CHANNELS,
+        )
 
     @utils.log_exceptions(logger=logger)
     async def _main_task(self):
         request_id = utils.shortuuid()
         segment_id = utils.shortuuid()
+        loop = asyncio.get_running_loop()
+        # 流被取消后SDK调用仍会在工作线程中继续回调,置位后不再向事件循环投递音频
+        cancelled = threading.Event()
+
+        def send_audio(audio: tts.SynthesizedAudio) -> None:
+            # 在事件循环线程中执行,投递期间通道可能已随流关闭
+            if not self._event_ch.closed:
+                self._event_ch.send_nowait(audio)
 
         class TTSCallback(ResultCallback):
             def __init__(self, stream):
                 self.stream = stream
-                self.audio_bstream = utils.audio.AudioByteStream(
-                    sample_rate=DASHSCOPE_TTS_SAMPLE_RATE,
-                    num_channels=DASHSCOPE_TTS_CHANNELS,
-                )
 
             def on_event(self, result: SpeechSynthesisResult):
-                if result.get_audio_frame() is not None:
+                if result.get_audio_frame() is not None and not cancelled.is_set():
                     audio_data = result.get_audio_frame()
-                    for frame in self.audio_bstream.write(audio_data):
-                        self.stream._event_ch.send_nowait(
-                            tts.SynthesizedAudio(
-                                request_id=request_id,
-                                segment_id=segment_id,
-                                frame=frame,
+                    for frame in self.stream._audio_bstream.write(audio_data):
+                        # 回调在线程池中执行,需切回事件循环线程发送
+                        try:
+                            loop.call_soon_threadsafe(
+                                send_audio,
+                                tts.SynthesizedAudio(
+                                    request_id=request_id,
+                                    segment_id=segment_id,
+                                    frame=frame,
+                                )
                             )
-                        )
+                        except RuntimeError:
+                            # 事件循环已关闭,丢弃剩余音频
+                            cancelled.set()
+                            return
 
-                if result.get_timestamp() is not None and self._opts.word_timestamp_enabled:
-                    logger.debug(f"Word timestamps: {result.get_timestamp()}")
+                if result.get_timestamp() is not None and self.stream._opts.word_timestamp_enabled:
+                    logger.debug("Word timestamps: %s", result.get_timestamp())
 
             def on_error(self, response: SpeechSynthesisResponse):
                 logger.error(f"DashScope TTS error: {response}")
@@ -129,21 +204,26 @@ class ChunkedStream(tts.ChunkedStream):
         callback = TTSCallback(self)
 
         # 调用DashScope TTS API
-        SpeechSynthesizer.call(
-            model=self._opts.model,
-            text=self._text,
-            sample_rate=self._opts.sample_rate,
-            format=self._opts.format,
-            volume=self._opts.volume,
-            rate=self._opts.rate,
-            pitch=self._opts.pitch,
-            callback=callback,
-            word_timestamp_enabled=self._opts.word_timestamp_enabled,
-            phoneme_timestamp_enabled=self._opts.phoneme_timestamp_enabled
-        )
+        try:
+            await run_blocking(
+                SpeechSynthesizer.call,
+                model=self._opts.model,
+                text=self._text,
+                sample_rate=self._opts.sample_rate,
+                format=self._opts.format,
+                volume=self._opts.volume,
+                rate=self._opts.rate,
+                pitch=self._opts.pitch,
+                callback=callback,
+                word_timestamp_enabled=self._opts.word_timestamp_enabled,
+                phoneme_timestamp_enabled=self._opts.phoneme_timestamp_enabled
+            )
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
 
         # 处理剩余数据
-        for frame in callback.audio_bstream.flush():
+        for frame in self._audio_bstream.flush():
             self._event_ch.send_nowait(
                 tts.SynthesizedAudio(
                     request_id=request_id,
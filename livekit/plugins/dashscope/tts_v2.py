@@ -7,14 +7,19 @@ from typing import AsyncContextManager, Literal
 import asyncio
 
 import dashscope
-from dashscope.audio.tts_v2 import SpeechSynthesizer, ResultCallback, AudioFormat
+from dashscope.audio.tts_v2 import ResultCallback, AudioFormat
 from livekit.agents import tts, utils,tokenize
 from livekit import rtc
 
+from . import _client_pool
+from ._executor import run_blocking
+from ._sentence_batch import submit_sentences
 from .log import logger
 # https://help.aliyun.com/zh/dashscope/developer-reference/cosyvoice-quick-start
 DASHSCOPE_TTS_CHANNELS = 1
 BUFFERED_WORDS_COUNT=8
+BATCH_CHARS=40
+OUTPUT_CHUNK_MS=100
 @dataclass 
 class _TTSOptions:
     model: str
@@ -26,6 +31,11 @@ class _TTSOptions:
     word_timestamp_enabled: bool  # 是否开启字级别时间戳
     phoneme_timestamp_enabled: bool  # 是否开启音素级别时间戳
     sent_tokenizer: tokenize.SentenceTokenizer
+    batch_chars: int  # 合并提交的最大字符数
+    max_batch_sentences: int  # 合并提交的最大句子数
+    output_chunk_ms: int  # 输出音频帧的时长(毫秒)
+    use_connection_pool: bool  # 是否复用对象池中已建立连接的合成器
+
 class TTSV2(tts.TTS):
     def __init__(
         self,
@@ -39,7 +49,11 @@ class TTSV2(tts.TTS):
         word_timestamp_enabled: bool = False,
         phoneme_timestamp_enabled: bool = False,
         api_key: str | None = None,
-        sent_tokenizer: tokenize.SentenceTokenizer = tokenize.basic.SentenceTokenizer()
+        sent_tokenizer: tokenize.SentenceTokenizer = tokenize.basic.SentenceTokenizer(),
+        batch_chars: int = BATCH_CHARS,
+        max_batch_sentences: int = BUFFERED_WORDS_COUNT,
+        output_chunk_ms: int = OUTPUT_CHUNK_MS,
+        use_connection_pool: bool = False,
     ) -> None:
         super().__init__(
             capabilities=tts.TTSCapabilities(streaming=True),
@@ -54,6 +68,12 @@ class TTSV2(tts.TTS):
             raise ValueError("Rate must be between 0.5 and 2.0")
         if not (0.5 <= pitch <= 2.0):
             raise ValueError("Pitch must be between 0.5 and 2.0")
+        if batch_chars < 0:
+            raise ValueError("batch_chars must be non-negative")
+        if max_batch_sentences < 1:
+            raise ValueError("max_batch_sentences must be at least 1")
+        if output_chunk_ms <= 0:
+            raise ValueError("output_chunk_ms must be positive")
 
         # 验证API key
         api_key = api_key or os.environ.get("DASHSCOPE_API_KEY")
@@ -71,12 +91,20 @@ class TTSV2(tts.TTS):
             pitch=pitch,
             word_timestamp_enabled=word_timestamp_enabled,
             phoneme_timestamp_enabled=phoneme_timestamp_enabled,
-            sent_tokenizer=sent_tokenizer
+            sent_tokenizer=sent_tokenizer,
+            batch_chars=batch_chars,
+            max_batch_sentences=max_batch_sentences,
+            output_chunk_ms=output_chunk_ms,
+            use_connection_pool=use_connection_pool and _client_pool.available(),
         )
+        # 启用连接池后须调用 aclose(),否则对象池的重连线程会阻止进程退出
+        self._pool_retained = self._opts.use_connection_pool
+        if self._pool_retained:
+            _client_pool.retain_pool()
 
     def synthesize(self, text: str) -> tts.ChunkedStream:
         """实现非流式合成方法"""
-        logger.debug(f"\033[32mDashScope TTS V2 synthesize: {text}\033[0m")
+        logger.debug("DashScope TTS V2 synthesize: %s", text)
         return ChunkedStream(
             text=text,
             opts=self._opts
@@ -87,12 +115,24 @@ class TTSV2(tts.TTS):
         """实现流式合成方法"""
         return SynthesizeStream(self._opts)
 
+    async def aclose(self) -> None:
+        if self._pool_retained:
+            self._pool_retained = False
+            await _client_pool.release_pool()
+
 class SynthesizeStream(tts.SynthesizeStream):
     def __init__(self, opts: _TTSOptions):
-        logger.debug("\033[32m [[tts.stream]] 实例化一个SynthesizeStream\033[0m")
+        logger.debug("[[tts.stream]] 实例化一个SynthesizeStream")
         super().__init__()
         self._opts = opts
         self._sent_tokenizer_stream = opts.sent_tokenizer.stream()
+        # 音频缓冲随流对象创建一次,由回调复用;
+        # SDK推送的小数据包在此合并为 output_chunk_ms 时长的帧后再入队,减少通道发送次数
+        self._audio_bstream = utils.audio.AudioByteStream(
+            sample_rate=opts.format.sample_rate,
+            num_channels=DASHSCOPE_TTS_CHANNELS,
+            samples_per_channel=opts.format.sample_rate * opts.output_chunk_ms // 1000,
+        )
 
     @utils.log_exceptions(logger=logger)
     async def _main_task(self) -> None:
@@ -101,7 +141,8 @@ class SynthesizeStream(tts.SynthesizeStream):
         segment_id = utils.shortuuid()
 
         callback = self.Callback(self._opts,self,request_id,segment_id)
-        synthesizer = SpeechSynthesizer(
+        synthesizer = await _client_pool.acquire(
+            pooled=self._opts.use_connection_pool,
             model=self._opts.model,
             voice=self._opts.voice,
             format=self._opts.format,
@@ -111,6 +152,8 @@ class SynthesizeStream(tts.SynthesizeStream):
             pitch_rate=self._opts.pitch
         )
 
+        completed = False
+
         async def input_task():
             async for data in self._input_ch:
                 if isinstance(data, self._FlushSentinel):
@@ -121,12 +164,17 @@ class SynthesizeStream(tts.SynthesizeStream):
 
 
         async def sentence_stream_task():
-            async for ev in self._sent_tokenizer_stream:
-                logger.info(f"\033[32m[[tts.sentence_stream_task]] detected: {ev.token}\033[0m")
-                synthesizer.streaming_call(ev.token)
+            nonlocal completed
+            await submit_sentences(
+                self._sent_tokenizer_stream,
+                synthesizer,
+                self._opts.batch_chars,
+                self._opts.max_batch_sentences,
+            )
             try:
                 # streaming_complete存在严重阻塞，影响其他任务，通过其他线程异步执行
-                await asyncio.get_event_loop().run_in_executor(None, synthesizer.streaming_complete) 
+                await run_blocking(synthesizer.streaming_complete)
+                completed = True
             except Exception as e:
                 logger.error(f"TTS streaming_complete error: {e}")
 
@@ -139,24 +187,26 @@ class SynthesizeStream(tts.SynthesizeStream):
             await asyncio.gather(*tasks)
         finally:
             await utils.aio.gracefully_cancel(*tasks)
+            # 仅在合成任务成功完成后归还,失败或取消时取消任务、关闭连接后丢弃
+            if completed and not callback.failed:
+                _client_pool.release(synthesizer, pooled=self._opts.use_connection_pool)
+            else:
+                await _client_pool.discard(synthesizer, pooled=self._opts.use_connection_pool)
                 
     class Callback(ResultCallback):
         def __init__(self, opts: _TTSOptions,stream,request_id,segment_id):
             self._opts = opts
             self.request_id = request_id
             self.segment_id = segment_id
-            self.audio_byte_stream = utils.audio.AudioByteStream(
-                sample_rate=self._opts.format.sample_rate,
-                num_channels=DASHSCOPE_TTS_CHANNELS,
-            )
             self.stream=stream
+            self.failed = False  # 服务端是否报告任务失败
 
         # def on_open(self) -> None:
         #     logger.debug("Synthesis started")
 
         def on_complete(self) -> None:
             # 输出剩余数据
-            for frame in self.audio_byte_stream.flush():
+            for frame in self.stream._audio_bstream.flush():
                 self.stream._event_ch.send_nowait(
                     tts.SynthesizedAudio(
                         request_id=self.request_id,
@@ -164,10 +214,12 @@ class SynthesizeStream(tts.SynthesizeStream):
                         frame=frame,
                     )
                 )
-            logger.debug("\033[32m [[tts.stream]] 音频数据已输出完成\033[0m")
+            logger.debug("[[tts.stream]] 音频数据已输出完成")
 
-        # def on_error(self, message) -> None:
-        #     logger.error(f"Synthesis error: {message}")
+        def on_error(self, message) -> None:
+            # 设置了回调时 streaming_complete 不会抛出任务失败,需在此记录
+            self.failed = True
+            logger.error(f"Synthesis error: {message}")
 
         # def on_close(self) -> None:
         #     logger.debug("Synthesis closed")
@@ -176,7 +228,7 @@ class SynthesizeStream(tts.SynthesizeStream):
         #     logger.debug(f"Synthesis event: {message}")
 
         def on_data(self, data: bytes) -> None:
-            for frame in self.audio_byte_stream.write(data):
+            for frame in self.stream._audio_bstream.write(data):
                 self.stream._event_ch.send_nowait(
                     tts.SynthesizedAudio(
                         request_id=self.request_id,
@@ -198,17 +250,19 @@ class ChunkedStream(tts.ChunkedStream):
         super().__init__()
         self._text = text
         self._opts = opts
+        self._audio_bstream = utils.audio.AudioByteStream(
+            sample_rate=self._opts.format.sample_rate,
+            num_channels=DASHSCOPE_TTS_CHANNELS,
+            samples_per_channel=self._opts.format.sample_rate * self._opts.output_chunk_ms // 1000,
+        )
 
     @utils.log_exceptions(logger=logger)
     async def _main_task(self):
         request_id = utils.shortuuid()
         segment_id = utils.shortuuid()
-        self.audio_bstream = utils.audio.AudioByteStream(
-            sample_rate=self._opts.format.sample_rate,
-            num_channels=DASHSCOPE_TTS_CHANNELS,
-        )
         # 创建合成器实例
-        synthesizer = SpeechSynthesizer(
+        synthesizer = await _client_pool.acquire(
+            pooled=self._opts.use_connection_pool,
             model=self._opts.model,
             voice=self._opts.voice,
             format=self._opts.format,
@@ -216,9 +270,24 @@ class ChunkedStream(tts.ChunkedStream):
             speech_rate=self._opts.rate,
             pitch_rate=self._opts.pitch
         )
-        # 调用合成方法并等待完成
-        audio = synthesizer.call(self._text)
-        for frame in self.audio_bstream.write(audio):
+        # 调用合成方法并等待完成;失败或取消时不归还合成器,关闭连接后丢弃
+        try:
+            audio = await run_blocking(synthesizer.call, self._text)
+        except BaseException:
+            await _client_pool.discard(synthesizer, pooled=self._opts.use_connection_pool)
+            raise
+        _client_pool.release(synthesizer, pooled=self._opts.use_connection_pool)
+        for frame in self._audio_bstream.write(audio):
+            self._event_ch.send_nowait(
+                tts.SynthesizedAudio(
+                    request_id=request_id,
+                    segment_id=segment_id,
+                    frame=frame,
+                )
+            )
+
+        # 处理剩余数据
+        for frame in self._audio_bstream.flush():
             self._event_ch.send_nowait(
                 tts.SynthesizedAudio(
                     request_id=request_id,
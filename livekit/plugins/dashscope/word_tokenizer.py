@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-import dataclasses
+import functools
+import re
 from dataclasses import dataclass
 from typing import List
 
 from livekit.agents import tokenize
 from livekit.agents.tokenize import WordStream, BufferedWordStream
 
-@dataclass
+TOKENIZE_CACHE_SIZE = 4096  # 分词结果缓存条数
+
+@dataclass(frozen=True)
 class _TokenizerOptions:
     """中文分词器的配置选项"""
     min_word_len: int  # 最小词长度
@@ -44,10 +47,22 @@ class ChineseWordTokenizer(tokenize.WordTokenizer):
                         '*', '/', '\\', '|', '@', '#', '$', '%', '^', '&'],
             ignore_punctuation=ignore_punctuation
         )
+        self._punct = frozenset(self._config.punctuations)
+
+        # 单个正则完成分词: 每个中文字符单独成词,其余非空白、非标点的连续字符成词,
+        # 不忽略标点时每个标点单独成词
+        punct = "".join(re.escape(p) for p in sorted(self._punct) if len(p) == 1)
+        cjk = "\u4e00-\u9fff"
+        word_pattern = rf"[{cjk}]|[^\s{punct}{cjk}]+"
+        if not self._config.ignore_punctuation:
+            word_pattern += rf"|[{punct}]"
+        self._word_re = re.compile(word_pattern)
+        # 相同文本会被反复分词,按实例缓存结果(配置在实例内不变)
+        self._tokenize_cached = functools.lru_cache(maxsize=TOKENIZE_CACHE_SIZE)(self._tokenize)
 
     def _sanitize_options(self) -> _TokenizerOptions:
-        """返回配置的副本"""
-        return dataclasses.replace(self._config)
+        """返回配置(配置为不可变对象,无需复制)"""
+        return self._config
 
     def _is_chinese_char(self, char: str) -> bool:
         """判断是否为中文字符"""
@@ -55,7 +70,7 @@ class ChineseWordTokenizer(tokenize.WordTokenizer):
 
     def _is_punctuation(self, char: str) -> bool:
         """判断是否为标点符号"""
-        return char in self._config.punctuations
+        return char in self._punct
 
     def _split_words(self, text: str) -> list[tuple[str, int, int]]:
         """核心分词逻辑
@@ -64,57 +79,35 @@ class ChineseWordTokenizer(tokenize.WordTokenizer):
         """
         if not text:
             return []
-            
+
+        return [(m.group(), m.start(), m.end()) for m in self._word_re.finditer(text)]
+
+    def split_words_with_byte_offsets(self, text: str) -> list[tuple[str, int, int]]:
+        """分词并返回UTF-8字节偏移,供按字节处理的下游(音频对齐、网络传输)直接使用
+
+        流式分词(BufferedWordStream)按字符下标切分字符串,因此 _split_words 仍返回字符位置。
+
+        返回: List[Tuple[词, 起始字节, 结束字节]]
+        """
         words = []
-        current_word = ''
-        start_pos = 0
-        
-        for i, char in enumerate(text):
-            # 跳过标点符号
-            if self._config.ignore_punctuation and self._is_punctuation(char):
-                if current_word:
-                    words.append((current_word, start_pos, i))
-                    current_word = ''
-                continue
-                
-            # 处理标点符号
-            if not self._config.ignore_punctuation and self._is_punctuation(char):
-                if current_word:
-                    words.append((current_word, start_pos, i))
-                words.append((char, i, i + 1))
-                current_word = ''
-                start_pos = i + 1
-                continue
-                
-            # 处理中文字符
-            if self._is_chinese_char(char):
-                if current_word:
-                    words.append((current_word, start_pos, i))
-                words.append((char, i, i + 1))
-                current_word = ''
-                start_pos = i + 1
-                continue
-                
-            # 处理其他字符(英文、数字等)
-            if char.isspace():
-                if current_word:
-                    words.append((current_word, start_pos, i))
-                    current_word = ''
-                    start_pos = i + 1
-            else:
-                if not current_word:
-                    start_pos = i
-                current_word += char
-                
-        # 处理最后一个词
-        if current_word:
-            words.append((current_word, start_pos, len(text)))
-            
+        byte_pos = 0
+        prev_end = 0
+        for m in self._word_re.finditer(text):
+            # 增量累加字节长度,避免每个词都从头换算字符位置
+            byte_pos += len(text[prev_end:m.start()].encode("utf-8"))
+            word = m.group()
+            byte_start = byte_pos
+            byte_pos += len(word.encode("utf-8"))
+            words.append((word, byte_start, byte_pos))
+            prev_end = m.end()
         return words
 
     def tokenize(self, text: str, *, language: str | None = None) -> list[str]:
         """将文本分割成词列表"""
-        return [word[0] for word in self._split_words(text)]
+        return list(self._tokenize_cached(text))
+
+    def _tokenize(self, text: str) -> tuple[str, ...]:
+        return tuple(word[0] for word in self._split_words(text))
 
     def stream(self, *, language: str | None = None) -> WordStream:
         """返回用于流式处理的分词器"""